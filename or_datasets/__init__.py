@@ -1,2 +1,47 @@
+import importlib
+
 from or_datasets._version import __version__
 from or_datasets.bunch import Bunch
+
+# registry of lazily imported attributes and the modules defining them
+_registry = {
+    "fetch_knapsack": "or_datasets.pisinger",
+    "fetch_linerlib": "or_datasets.linerlib",
+    "fetch_linerlib_rotations": "or_datasets.linerlib",
+    "fetch_vrp_rep": "or_datasets.vrp_rep",
+    "generate_knapsack": "or_datasets.generators",
+    "generate_vrptw": "or_datasets.generators",
+    "GraphBuilder": "or_datasets.linerlib",
+}
+
+# lazily imported submodules
+_submodules = [
+    "cache",
+    "columnar",
+    "generators",
+    "lazy",
+    "linerlib",
+    "pisinger",
+    "shared",
+    "stats",
+    "vrp_rep",
+]
+
+__all__ = ["__version__", "Bunch"] + sorted(_registry) + _submodules
+
+
+def __getattr__(name):
+    if name in _submodules:
+        value = importlib.import_module(f"{__name__}.{name}")
+    elif name in _registry:
+        value = getattr(importlib.import_module(_registry[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # cache so the module is only resolved on first use
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return __all__
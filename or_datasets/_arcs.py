@@ -0,0 +1,126 @@
+import heapq
+import math
+from typing import Dict, List, Tuple
+
+
+def _distance(x: List[int], y: List[int], i: int, j: int) -> float:
+    return int(math.sqrt(math.pow(x[i] - x[j], 2) + math.pow(y[i] - y[j], 2)) * 10) / 10
+
+
+def get_arcs(n: int, x: List[int], y: List[int]):
+    """
+    Builds the arcs between all nodes of a VRP instance with the depot as first and
+    its duplicate as last node. Costs and travel times are the euclidean distances
+    truncated to one decimal.
+
+    Returns:
+        The arcs `(i, j)` and their costs and travel times.
+    """
+    m: List[Tuple[int, int]] = []
+    c: List[float] = []
+    t: List[float] = []
+
+    for i in range(n):
+        for j in range(n):
+            if j <= i:
+                continue
+
+            value = _distance(x, y, i, j)
+
+            if i != n - 1 and j != 0 and not (i == 0 and j == n - 1):
+                c.append(value)
+                t.append(value)
+                m.append((i, j))
+
+            if j != n - 1 and i != 0:
+                c.append(value)
+                t.append(value)
+                m.append((j, i))
+
+    return m, c, t
+
+
+def get_nearest_arcs(n: int, x: List[int], y: List[int], k: int):
+    """
+    Builds a sparse set of arcs like [get_arcs][or_datasets._arcs.get_arcs], where
+    every customer only has arcs to its `k` nearest customers. The depot keeps its
+    arcs to and from every customer.
+
+    Returns:
+        The arcs `(i, j)` and their costs and travel times.
+    """
+    customers = range(1, n - 1)
+    grid = _Grid(x, y, customers, k)
+
+    arcs = [(0, j) for j in customers]
+    for i in customers:
+        arcs += [(i, j) for j in grid.nearest(i, k)]
+        arcs.append((i, n - 1))
+
+    c = [_distance(x, y, i, j) for i, j in arcs]
+
+    return arcs, c, list(c)
+
+
+class _Grid:
+    # customers bucketed in square cells holding about k customers each, so a
+    # nearest neighbour search only visits the cells around a customer
+
+    def __init__(self, x: List[int], y: List[int], nodes: range, k: int):
+        self.x = x
+        self.y = y
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+        if not nodes:
+            self.side = 0
+            return
+
+        self.minX = min(x[i] for i in nodes)
+        self.minY = min(y[i] for i in nodes)
+        width = max(max(x[i] for i in nodes) - self.minX, 1)
+        height = max(max(y[i] for i in nodes) - self.minY, 1)
+
+        self.side = max(1, int(math.sqrt(len(nodes) / max(1, k))))
+        self.size = max(width, height) / self.side
+
+        for i in nodes:
+            self.cells.setdefault(self._cell(i), []).append(i)
+
+    def _cell(self, i: int) -> Tuple[int, int]:
+        return (
+            min(self.side - 1, int((self.x[i] - self.minX) / self.size)),
+            min(self.side - 1, int((self.y[i] - self.minY) / self.size)),
+        )
+
+    def nearest(self, i: int, k: int) -> List[int]:
+        x, y = self.x, self.y
+        cellX, cellY = self._cell(i)
+
+        # grow rings of cells until no closer node can be outside of them
+        candidates: List[Tuple[int, int]] = []
+        nearest: List[Tuple[int, int]] = []
+        for r in range(self.side):
+            for cell in _ring(cellX, cellY, r):
+                for j in self.cells.get(cell, ()):
+                    if j != i:
+                        candidates.append(((x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2, j))
+
+            nearest = heapq.nsmallest(k, candidates)
+            if len(nearest) == k and nearest[-1][0] <= (r * self.size) ** 2:
+                break
+
+        return [j for _, j in nearest]
+
+
+def _ring(cellX: int, cellY: int, r: int):
+    if r == 0:
+        yield cellX, cellY
+        return
+
+    for dx in range(-r, r + 1):
+        yield cellX + dx, cellY - r
+        yield cellX + dx, cellY + r
+
+    for dy in range(-r + 1, r):
+        yield cellX - r, cellY + dy
+        yield cellX + r, cellY + dy
@@ -0,0 +1,248 @@
+import array
+import collections.abc
+from typing import Any, Dict, Iterator, List, Tuple
+
+# alignment of every array in a buffer, enough for 8 byte items
+ALIGNMENT = 8
+
+
+class Rows(collections.abc.Sequence):
+    """
+    Read-only sequence of fixed width tuples over a flat sequence, e.g. the edges
+    `(i, j)` of an instance. The flat sequence is available as `buffer`.
+    """
+
+    def __init__(self, buffer: collections.abc.Sequence, width: int):
+        self.buffer = buffer
+        self.width = width
+
+    def __len__(self) -> int:
+        return len(self.buffer) // self.width
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("row index out of range")
+
+        return tuple(self.buffer[i * self.width : (i + 1) * self.width])
+
+
+class Nested(collections.abc.Sequence):
+    """
+    Read-only sequence of variable length sequences, e.g. rotations of ports. Item
+    `i` is `values[offsets[i] : offsets[i + 1]]`.
+    """
+
+    def __init__(self, offsets: memoryview, values: collections.abc.Sequence):
+        self.offsets = offsets
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("index out of range")
+
+        return self.values[self.offsets[i] : self.offsets[i + 1]]
+
+
+class Strings(collections.abc.Sequence):
+    """
+    Read-only sequence of strings stored as UTF-8 data and offsets. Strings are
+    only decoded when accessed.
+    """
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("index out of range")
+
+        return str(self.data[self.offsets[i] : self.offsets[i + 1]], "utf-8")
+
+
+class _Layout:
+    def __init__(self, offset: int):
+        self.offset = offset
+        self.chunks: List[Tuple[int, Any]] = []
+
+    def add(self, values: array.array) -> Dict[str, Any]:
+        self.offset += -self.offset % ALIGNMENT
+        spec = {
+            "kind": "array",
+            "typecode": values.typecode,
+            "offset": self.offset,
+            "length": len(values),
+        }
+        self.chunks.append((self.offset, values))
+        self.offset += len(values) * values.itemsize
+        return spec
+
+    def pack(self, value: Any) -> Dict[str, Any]:
+        if isinstance(value, array.array):
+            return self.add(value)
+
+        if isinstance(value, (bytes, bytearray)):
+            return self.add(array.array("B", value))
+
+        if isinstance(value, dict) and all(type(k) is str for k in value):
+            return {
+                "kind": "dict",
+                "columns": {k: self.pack(v) for k, v in value.items()},
+            }
+
+        if not isinstance(value, list):
+            return {"kind": "value", "value": value}
+
+        types = set(map(type, value))
+        if types <= {int}:
+            return self.add(array.array("q", value))
+
+        if types <= {int, float}:
+            return self.add(array.array("d", value))
+
+        if types == {str}:
+            data = [v.encode("utf-8") for v in value]
+            return {
+                "kind": "strings",
+                "offsets": self.add(_offsets(data)),
+                "data": self.add(array.array("B", b"".join(data))),
+            }
+
+        if types == {tuple} and len(set(map(len, value))) == 1:
+            return {
+                "kind": "rows",
+                "width": len(value[0]),
+                "values": self.pack([v for row in value for v in row]),
+            }
+
+        if types == {list}:
+            return {
+                "kind": "nested",
+                "offsets": self.add(_offsets(value)),
+                "values": self.pack([v for row in value for v in row]),
+            }
+
+        return {"kind": "value", "value": value}
+
+
+def _offsets(rows: List[Any]) -> array.array:
+    offsets = array.array("q", [0])
+    for row in rows:
+        offsets.append(offsets[-1] + len(row))
+    return offsets
+
+
+def pack(
+    instance: Tuple, offset: int = 0
+) -> Tuple[List[Dict[str, Any]], int, List[Tuple[int, Any]]]:
+    """
+    Lays out the fields of an instance tuple in one flat buffer.
+
+    Lists of ints become int64 arrays and lists of numbers float64 arrays.
+    `array.array`, `bytes` and `bytearray` keep their item type. Lists of strings
+    are stored as UTF-8 data with int64 offsets, lists of equally long tuples as
+    their flattened values, lists of lists as int64 offsets and flattened values,
+    and dicts with string keys column by column. Other fields are kept as values.
+
+    Parameters:
+        instance: The instance tuple.
+        offset: Offset of the first array in the buffer.
+
+    Returns:
+        The field specifications, the end offset of the last array and the
+        `(offset, array)` chunks to copy into the buffer.
+    """
+    layout = _Layout(offset)
+    specs = [layout.pack(value) for value in instance]
+
+    return specs, layout.offset, layout.chunks
+
+
+def write(buffer: memoryview, chunks: List[Tuple[int, Any]]) -> None:
+    """
+    Copies the chunks returned by [pack][or_datasets._arrays.pack] into a buffer.
+    """
+    for offset, values in chunks:
+        raw = memoryview(values).cast("B")
+        buffer[offset : offset + len(raw)] = raw
+
+
+def _unpack(spec: Dict[str, Any], buffer: memoryview) -> Any:
+    kind = spec["kind"]
+
+    if kind == "value":
+        return spec["value"]
+
+    if kind == "array":
+        itemsize = array.array(spec["typecode"]).itemsize
+        start = spec["offset"]
+        return buffer[start : start + spec["length"] * itemsize].cast(spec["typecode"])
+
+    if kind == "dict":
+        return {k: _unpack(v, buffer) for k, v in spec["columns"].items()}
+
+    if kind == "strings":
+        return Strings(_unpack(spec["offsets"], buffer), _unpack(spec["data"], buffer))
+
+    if kind == "rows":
+        return Rows(_unpack(spec["values"], buffer), spec["width"])
+
+    if kind == "nested":
+        return Nested(_unpack(spec["offsets"], buffer), _unpack(spec["values"], buffer))
+
+    raise ValueError(f"unknown field kind '{kind}'")
+
+
+def unpack(specs: List[Dict[str, Any]], buffer: memoryview) -> Tuple:
+    """
+    Builds an instance tuple of read-only views into a buffer laid out by
+    [pack][or_datasets._arrays.pack]. No element is copied or deserialized.
+    """
+    buffer = buffer.cast("B")
+    if not buffer.readonly:
+        # Python 3.8 and newer, like the shared memory blocks that are writable
+        buffer = buffer.toreadonly()
+
+    return tuple(_unpack(spec, buffer) for spec in specs)
+
+
+def views(value: Any) -> Iterator[memoryview]:
+    """
+    Yields the views into the buffer held by a value built by
+    [unpack][or_datasets._arrays.unpack], e.g. to release them.
+    """
+    if isinstance(value, memoryview):
+        yield value
+    elif isinstance(value, Rows):
+        yield from views(value.buffer)
+    elif isinstance(value, Nested):
+        yield from views(value.offsets)
+        yield from views(value.values)
+    elif isinstance(value, Strings):
+        yield from views(value.offsets)
+        yield from views(value.data)
+    elif isinstance(value, (tuple, dict)):
+        items = value.values() if isinstance(value, dict) else value
+        for item in items:
+            yield from views(item)
@@ -9,6 +9,7 @@ class Bunch(dict):
     data | List[Any] | An array of data for a set of instances | List[]
     instance | Optional[Any] | Data for a specified instance otherwise | None
     DESCR | str | The full description of the data set | None
+    stats | Stats | Per-stage timing and memory statistics of the fetch | None
     """
 
     def __init__(self, **kwargs):
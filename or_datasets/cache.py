@@ -0,0 +1,291 @@
+import array
+import collections
+import contextlib
+import itertools
+import os
+import sys
+import threading
+from typing import Any, Callable, ContextManager, Hashable, Iterator, Optional
+
+
+class LRUCache:
+    """
+    Least recently used cache bounded by a budget.
+
+    Every entry has a cost, e.g. its size in bytes, and the least recently used
+    entries are evicted once the total cost exceeds the budget.
+    """
+
+    def __init__(self, budget: int, close: Optional[Callable[[Any], None]] = None):
+        """
+        Initialize the cache.
+
+        Parameters:
+            budget: The maximum total cost of the entries.
+            close: Called with every evicted value, e.g. to close file handles.
+        """
+        self.budget = budget
+        self.close = close
+        self.total = 0
+        self._entries: "collections.OrderedDict[Hashable, Any]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Gets a value and marks it as most recently used.
+
+        Parameters:
+            key: The key of the value.
+            default: Returned if the key is not cached.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return default
+
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key: Hashable, value: Any, cost: int) -> None:
+        """
+        Adds a value. Values costing more than the budget are not cached.
+
+        Parameters:
+            key: The key of the value.
+            value: The value.
+            cost: The cost of the value.
+        """
+        with self._lock:
+            self.pop(key)
+            if cost > self.budget:
+                return
+
+            self._entries[key] = (value, cost)
+            self.total += cost
+            self._evict()
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Removes a value.
+
+        Parameters:
+            key: The key of the value.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return
+
+            value, cost = self._entries.pop(key)
+            self.total -= cost
+            if self.close:
+                self.close(value)
+
+    def invalidate(self, *prefix: Any) -> None:
+        """
+        Removes all values whose tuple key starts with `prefix`.
+
+        Parameters:
+            prefix: The leading key elements. Removes everything if empty.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if key[: len(prefix)] == prefix:
+                    self.pop(key)
+
+    def resize(self, budget: int) -> None:
+        """
+        Changes the budget, evicting values if needed.
+
+        Parameters:
+            budget: The maximum total cost of the entries.
+        """
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def _evict(self) -> None:
+        while self.total > self.budget:
+            self.pop(next(iter(self._entries)))
+
+
+def _sizeof(value: Any) -> int:
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        return size + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+
+    if isinstance(value, (list, tuple)) and value:
+        # homogeneous numeric sequences are the bulk of parsed instances
+        if type(value[0]) in (int, float) and all(
+            type(v) is type(value[0]) for v in value
+        ):
+            return size + len(value) * sys.getsizeof(value[0])
+
+        return size + sum(_sizeof(v) for v in value)
+
+    return size
+
+
+_scalars = {int, float, str, bool, type(None)}
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, list):
+        # lists of scalars or of tuples of scalars, like edges, are copied shallowly
+        types = set(map(type, value))
+        if types <= _scalars:
+            return list(value)
+        if types == {tuple} and (
+            set(map(type, itertools.chain.from_iterable(value))) <= _scalars
+        ):
+            return list(value)
+
+        return [_copy(v) for v in value]
+
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+
+    if isinstance(value, (array.array, bytearray)):
+        return value[:]
+
+    return value
+
+
+class _Handle:
+    # an open archive, lent to one reader at a time since readers share its file
+    # position, and closed once it is evicted and every borrower is done
+
+    def __init__(self, archive: Any):
+        self.archive = archive
+        self.lock = threading.RLock()
+        self.borrowers = 0
+        self.evicted = False
+
+
+def _close(handle: _Handle) -> None:
+    handle.evicted = True
+    if not handle.borrowers:
+        handle.archive.close()
+
+
+_archives = LRUCache(budget=8, close=_close)
+_instances = LRUCache(budget=256 * 1024 * 1024)
+
+
+def open_archive(filename: str, opener: Callable[[str], Any]) -> ContextManager:
+    """
+    Opens an archive or returns the handle cached by an earlier call.
+
+    ```python
+    with open_archive(filename, zipfile.ZipFile) as zf:
+        names = zf.namelist()
+    ```
+
+    Archives are keyed by file name, size and modification time, so a file that is
+    downloaded again is opened again. At most 8 handles are kept open.
+
+    Parameters:
+        filename: Path of the archive.
+        opener: Opens the archive, e.g. `zipfile.ZipFile` or `tarfile.open`.
+
+    Returns:
+        A context manager lending the archive handle. A handle is lent to one
+        thread at a time, is closed once it is evicted and no longer lent, and must
+        not be closed by the caller.
+    """
+    stat = os.stat(filename)
+    key = ("archive", filename, stat.st_size, stat.st_mtime_ns)
+
+    with _archives._lock:
+        handle = _archives.get(key)
+        if handle is None:
+            _archives.invalidate("archive", filename)
+            handle = _Handle(opener(filename))
+            _archives.put(key, handle, 1)
+
+        handle.borrowers += 1
+
+    return _lend(handle)
+
+
+@contextlib.contextmanager
+def _lend(handle: _Handle) -> Iterator[Any]:
+    try:
+        with handle.lock:
+            yield handle.archive
+    finally:
+        with _archives._lock:
+            handle.borrowers -= 1
+            if handle.evicted and not handle.borrowers:
+                handle.archive.close()
+
+
+def get(key: Hashable) -> Any:
+    """
+    Gets a parsed instance.
+
+    Parameters:
+        key: Tuple key, e.g. `("fetch_vrp_rep", "solomon-1987-r1", "R101_025.xml")`.
+
+    Returns:
+        A copy of the parsed instance or `None` if not cached. Lists, dicts and
+        arrays are copied, so the caller may modify them.
+    """
+    value = _instances.get(key)
+    if value is None:
+        return None
+
+    return _copy(value)
+
+
+def put(key: Hashable, value: Any) -> None:
+    """
+    Caches a copy of a parsed instance, so later changes to `value` do not affect
+    the cache.
+
+    Parameters:
+        key: Tuple key, e.g. `("fetch_vrp_rep", "solomon-1987-r1", "R101_025.xml")`.
+        value: The parsed instance.
+    """
+    value = _copy(value)
+    _instances.put(key, value, _sizeof(value))
+
+
+def set_budget(nbytes: int) -> None:
+    """
+    Sets the memory budget of parsed instances, 256 MiB by default. A budget of `0`
+    disables caching of parsed instances.
+
+    Parameters:
+        nbytes: The approximate number of bytes that may be held.
+    """
+    _instances.resize(nbytes)
+
+
+def invalidate(*prefix: Any) -> None:
+    """
+    Drops cached instances, e.g. `invalidate("fetch_knapsack", "small")` drops the
+    instances of the small Pisinger set.
+
+    Parameters:
+        prefix: Leading key elements: fetcher name, data set and instance file.
+    """
+    _instances.invalidate(*prefix)
+
+
+def clear() -> None:
+    """
+    Drops all cached instances and closes all cached archives.
+    """
+    _instances.invalidate()
+    _archives.invalidate()
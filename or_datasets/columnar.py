@@ -0,0 +1,122 @@
+import json
+import mmap
+import struct
+import sys
+from typing import List, Tuple, Union
+
+from or_datasets import Bunch, _arrays
+
+MAGIC = b"ORDSCOL1"
+"""The first 8 bytes of a columnar file."""
+
+_header = struct.Struct("<8sQ")
+
+
+def save(path: str, data: Union[Bunch, List[Tuple]]) -> None:
+    """
+    Exports instances to a memory-mappable columnar file.
+
+    ```python
+    bunch = fetch_vrp_rep("solomon-1987-r1")
+    save("solomon-1987-r1.ords", bunch)
+    ```
+
+    Works for the instance tuples of all fetchers, e.g. VRP-REP, knapsack and
+    LINERLIB instances, and for liner graphs given as tuples like
+    `(nodes, edges, cost, travelTime, capacity)` of a
+    [GraphBuilder][or_datasets.linerlib.GraphBuilder].
+
+    The file starts with the 8 bytes `ORDSCOL1`, followed by the little-endian
+    uint64 length of a UTF-8 JSON header. The raw arrays follow the header, with the
+    data section starting at the next multiple of 8 bytes. The header holds the
+    `DESCR`, the `byteorder` of the arrays and one list of field specifications per
+    instance. A field is one of
+
+    Kind | Keys | Content
+    ---- | ---- | -------
+    value | value | A JSON value, e.g. the instance name
+    array | typecode, offset, length | Items of an `array` module typecode
+    strings | offsets, data | UTF-8 `data` array and `len + 1` int64 `offsets`
+    rows | width, values | Fixed width tuples, e.g. edges, flattened
+    nested | offsets, values | Variable length lists as offsets and flattened values
+    dict | columns | A field per key, e.g. per CSV column
+
+    Array offsets are in bytes from the start of the data section and are multiples
+    of 8.
+
+    Parameters:
+        path: Path of the file to write.
+        data: A bunch returned by a fetcher or a list of instance tuples.
+    """
+    if isinstance(data, Bunch):
+        descr = data.get("DESCR")
+        instances = data["data"]
+    else:
+        descr = None
+        instances = data
+
+    offset = 0
+    fields = []
+    chunks = []
+    for instance in instances:
+        specs, offset, instanceChunks = _arrays.pack(instance, offset)
+        fields.append(specs)
+        chunks += instanceChunks
+
+    header = json.dumps(
+        {"DESCR": descr, "byteorder": sys.byteorder, "instances": fields}
+    ).encode("utf-8")
+    start = _header.size + len(header)
+    start += -start % _arrays.ALIGNMENT
+
+    with open(path, "wb") as f:
+        f.write(_header.pack(MAGIC, len(header)))
+        f.write(header)
+        for chunkOffset, values in chunks:
+            f.seek(start + chunkOffset)
+            f.write(memoryview(values).cast("B"))
+
+        # pad to the end of the data section
+        f.truncate(start + offset)
+
+
+def load(path: str) -> Bunch:
+    """
+    Loads instances exported with [save][or_datasets.columnar.save] by memory
+    mapping the file.
+
+    ```python
+    bunch = load("solomon-1987-r1.ords")
+    name, n, E, c, d, Q, t, a, b, x, y = bunch["data"][0]
+    ```
+
+    Nothing is deserialized per element. Numeric lists are returned as read-only
+    `memoryview`s into the mapping, edges as sequences of tuples and strings are
+    decoded on access. The mapping stays open as long as any view is referenced.
+
+    Parameters:
+        path: Path of the file.
+
+    Returns:
+        The instances in `data`, as returned by the fetchers.
+    """
+    with open(path, "rb") as f:
+        magic, length = _header.unpack(f.read(_header.size))
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a columnar or_datasets file")
+
+        header = json.loads(f.read(length).decode("utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(
+                f"'{path}' was written on a {header['byteorder']} endian machine"
+            )
+
+        start = _header.size + length
+        start += -start % _arrays.ALIGNMENT
+
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(mm)[start:]
+
+    data = [_arrays.unpack(specs, buffer) for specs in header["instances"]]
+
+    return Bunch(data=data, instance=None, DESCR=header["DESCR"])
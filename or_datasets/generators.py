@@ -0,0 +1,231 @@
+import math
+import random
+from typing import List, Optional
+
+from or_datasets import Bunch
+from or_datasets._arcs import get_arcs, get_nearest_arcs
+
+_knapsackTypes = {
+    "uncorrelated": 1,
+    "weakly_correlated": 2,
+    "strongly_correlated": 3,
+    "inverse_strongly_correlated": 4,
+    "almost_strongly_correlated": 5,
+    "subset_sum": 6,
+    "uncorrelated_spanner": 11,
+    "weakly_correlated_spanner": 12,
+    "strongly_correlated_spanner": 13,
+}
+
+# depot, horizon, capacity and service time of the Solomon (1987) families
+_solomonProfiles = {
+    ("R", 1): ((35, 35), 230, 200, 10),
+    ("R", 2): ((35, 35), 1000, 1000, 10),
+    ("C", 1): ((40, 50), 1236, 200, 90),
+    ("C", 2): ((40, 50), 3390, 700, 90),
+    ("RC", 1): ((40, 50), 240, 200, 10),
+    ("RC", 2): ((40, 50), 960, 1000, 10),
+}
+
+
+def _uniform(rnd: random.Random, low: int, high: int, k: int) -> List[int]:
+    # choices draws all k values in one call
+    return rnd.choices(range(low, high + 1), k=k)
+
+
+def _correlated(rnd: random.Random, t: int, R: int, n: int):
+    if t == 4:
+        p = _uniform(rnd, 1, R, n)
+        return p, [v + R // 10 for v in p]
+
+    w = _uniform(rnd, 1, R, n)
+
+    if t == 1:
+        p = _uniform(rnd, 1, R, n)
+    elif t == 2:
+        p = [max(1, v + o) for v, o in zip(w, _uniform(rnd, -R // 10, R // 10, n))]
+    elif t == 3:
+        p = [v + R // 10 for v in w]
+    elif t == 5:
+        offsets = _uniform(rnd, R // 10 - R // 500, R // 10 + R // 500, n)
+        p = [v + o for v, o in zip(w, offsets)]
+    else:
+        p = list(w)
+
+    return p, w
+
+
+def generate_knapsack(
+    n: int,
+    kind: str = "uncorrelated",
+    R: int = 1000,
+    h: int = 1,
+    H: int = 100,
+    seed: Optional[int] = None,
+) -> Bunch:
+    """
+    Generates knapsack instances of the families used by Pisinger for the data sets
+    of [fetch_knapsack][or_datasets.pisinger.fetch_knapsack], see "Where are the
+    hard knapsack problems?" by Pisinger 2005.
+
+    Possible kinds are `uncorrelated`, `weakly_correlated`, `strongly_correlated`,
+    `inverse_strongly_correlated`, `almost_strongly_correlated`, `subset_sum`,
+    `uncorrelated_spanner`, `weakly_correlated_spanner` and
+    `strongly_correlated_spanner`. Spanner instances use a spanner set of 2 items
+    and multipliers up to 10.
+
+    Usage for generating a large instance is:
+    ```python
+    bunch = generate_knapsack(1000000, kind="strongly_correlated", seed=0)
+    name, n, c, p, w, z, x = bunch["instance"]
+    ```
+
+    Parameters:
+        n: Number of items.
+        kind: The family of the instance.
+        R: Range of the coefficients.
+        h: Number of the instance in a series of `H` instances. The capacity is
+            `h / (H + 1)` of the total weight.
+        H: Size of the series.
+        seed: Seed of the random generator.
+
+    Returns:
+        An instance like the ones of
+        [fetch_knapsack][or_datasets.pisinger.fetch_knapsack]. The optimal value `z`
+        and solution `x` are unknown and `None`.
+    """
+    if kind not in _knapsackTypes:
+        raise KeyError(f"unknown knapsack kind '{kind}'")
+
+    t = _knapsackTypes[kind]
+    rnd = random.Random(seed)
+
+    if t > 10:
+        # spanner set normalized by the multiplier limit
+        v, m = 2, 10
+        spannerP, spannerW = _correlated(rnd, t - 10, R, v)
+        spannerP = [max(1, value // (m + 1)) for value in spannerP]
+        spannerW = [max(1, value // (m + 1)) for value in spannerW]
+
+        items = _uniform(rnd, 0, v - 1, n)
+        multipliers = _uniform(rnd, 1, m, n)
+        p = [a * spannerP[k] for k, a in zip(items, multipliers)]
+        w = [a * spannerW[k] for k, a in zip(items, multipliers)]
+    else:
+        p, w = _correlated(rnd, t, R, n)
+
+    c = h * sum(w) // (H + 1)
+
+    data = (f"knapPI_{t}_{n}_{R}_{h}", n, c, p, w, None, None)
+
+    return Bunch(data=[data], instance=data, DESCR="Knapsack")
+
+
+def _clustered(rnd: random.Random, k: int):
+    centers = list(zip(_uniform(rnd, 10, 90, 10), _uniform(rnd, 10, 90, 10)))
+    points = rnd.choices(centers, k=k)
+
+    x = [min(100, max(0, int(rnd.gauss(cx, 5)))) for cx, _ in points]
+    y = [min(100, max(0, int(rnd.gauss(cy, 5)))) for _, cy in points]
+
+    return x, y
+
+
+def generate_vrptw(
+    customers: int = 100,
+    kind: str = "R",
+    series: int = 1,
+    density: float = 1.0,
+    seed: Optional[int] = None,
+    neighbours: Optional[int] = None,
+) -> Bunch:
+    """
+    Generates VRPTW instances in the style of the Solomon (1987) families fetched by
+    [fetch_vrp_rep][or_datasets.vrp_rep.fetch_vrp_rep].
+
+    Customers are placed uniformly (`R`), in clusters (`C`) or half and half (`RC`)
+    on a 100 by 100 grid. Series `1` has a short horizon and small vehicles, series
+    `2` a long horizon and large vehicles.
+
+    Usage for generating an instance is:
+    ```python
+    bunch = generate_vrptw(200, kind="RC", series=1, seed=0)
+    name, n, E, c, d, Q, t, a, b, x, y = bunch["instance"]
+    ```
+
+    Note: By default the edges are all pairs of nodes, so memory and time grow
+    quadratically with the number of customers. Pass `neighbours` for large
+    instances:
+    ```python
+    bunch = generate_vrptw(10000, neighbours=10, seed=0)
+    ```
+
+    Parameters:
+        customers: Number of customers.
+        kind: Layout of the customers, `R`, `C` or `RC`.
+        series: `1` or `2`.
+        density: Share of customers with a tight time window. The others can be
+            served at any time within the horizon.
+        seed: Seed of the random generator.
+        neighbours: If given, every customer only has edges to its `neighbours`
+            nearest customers and to the depot, so the number of edges grows
+            linearly with the number of customers.
+
+    Returns:
+        An instance like the ones of [fetch_vrp_rep][or_datasets.vrp_rep.fetch_vrp_rep]
+        with the depot duplicated as last node.
+    """
+    if (kind, series) not in _solomonProfiles:
+        raise KeyError(f"unknown Solomon family '{kind}{series}'")
+
+    (depotX, depotY), T, Q, s = _solomonProfiles[(kind, series)]
+    rnd = random.Random(seed)
+
+    # coordinates
+    if kind == "R":
+        x = _uniform(rnd, 0, 100, customers)
+        y = _uniform(rnd, 0, 100, customers)
+    elif kind == "C":
+        x, y = _clustered(rnd, customers)
+    else:
+        x, y = _clustered(rnd, customers // 2)
+        x += _uniform(rnd, 0, 100, customers - customers // 2)
+        y += _uniform(rnd, 0, 100, customers - customers // 2)
+
+    x = [depotX] + x + [depotX]
+    y = [depotY] + y + [depotY]
+    n = customers + 2
+
+    if neighbours is None:
+        m, c, t = get_arcs(n, x, y)
+    else:
+        m, c, t = get_nearest_arcs(n, x, y, neighbours)
+
+    # demands
+    d = [0] + _uniform(rnd, 1, 50, customers) + [0]
+
+    # time windows within reach of the depot
+    reach = [math.ceil(math.hypot(x[i] - depotX, y[i] - depotY)) for i in range(n)]
+    widths = _uniform(rnd, 5, 30 if series == 1 else 120, customers)
+    tight = [rnd.random() < density for _ in range(customers)]
+    a = [0] * n
+    b = [0] * n
+    for i in range(1, n - 1):
+        earliest, latest = reach[i], max(reach[i], T - reach[i] - s)
+        width = widths[i - 1]
+        if tight[i - 1]:
+            center = rnd.randint(earliest, latest)
+            a[i] = max(earliest, center - width)
+            b[i] = min(latest, center + width)
+        else:
+            a[i], b[i] = 0, latest
+
+    # set tw for duplicate depot node
+    b[n - 1] = T
+
+    # service time on edges leaving customers
+    t = [value + (s if 0 < i < n - 1 else 0) for (i, _), value in zip(m, t)]
+
+    data = (f"{kind}{series}_{customers:03d}", n, m, c, d, Q, t, a, b, x, y)
+
+    return Bunch(data=[data], instance=data, DESCR="VRPTW")
@@ -0,0 +1,81 @@
+import collections.abc
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class LazyData(collections.abc.Sequence):
+    """
+    Read-only sequence of instances that are only parsed when accessed. Returned as
+    `data` by fetchers called with `lazy=True`.
+
+    ```python
+    bunch = fetch_knapsack("large", lazy=True)
+    bunch["data"].keep = False
+    for name, n, c, p, w, z, x in bunch["data"]:
+        ...
+    ```
+
+    Accessed instances are kept unless `keep` is `False`, in which case they are
+    not added to the instance [cache][or_datasets.cache] either. Iterating without
+    keeping instances then holds one instance at a time.
+    """
+
+    def __init__(
+        self,
+        keys: List[Any],
+        load: Callable[[Any], Any],
+        keep=True,
+        iterate: Optional[Callable[[List[Any]], Iterator[Any]]] = None,
+    ):
+        """
+        Initialize the sequence.
+
+        Parameters:
+            keys: One key per instance, e.g. the instance file name.
+            load: Parses the instance of a key.
+            keep: If `True` accessed instances are kept.
+            iterate: Parses the instances of all keys in order, e.g. in one pass
+                over every file. Used for iteration instead of `load`.
+        """
+        self.keys = keys
+        self.load = load
+        self.keep = keep
+        self.iterate = iterate
+        self._loaded: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("instance index out of range")
+
+        if i in self._loaded:
+            return self._loaded[i]
+
+        value = self.load(self.keys[i])
+        if self.keep:
+            self._loaded[i] = value
+
+        return value
+
+    def __iter__(self):
+        if self.iterate is None or len(self._loaded) == len(self):
+            for i in range(len(self)):
+                yield self[i]
+            return
+
+        for i, value in enumerate(self.iterate(self.keys)):
+            if i in self._loaded:
+                value = self._loaded[i]
+            elif self.keep:
+                self._loaded[i] = value
+
+            yield value
+
+    def __repr__(self) -> str:
+        return f"LazyData({len(self)} instances, {len(self._loaded)} loaded)"
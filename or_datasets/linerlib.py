@@ -1,3 +1,4 @@
+import functools
 import math
 import zipfile
 import csv
@@ -6,23 +7,27 @@ import urllib.request
 import shutil
 import tempfile
 import io
-from or_datasets import Bunch
-from typing import Dict, Any, Tuple, List
+from or_datasets import Bunch, cache
+from or_datasets.stats import Stats
+from typing import ContextManager, Dict, Any, Optional, Set, Tuple, List
 
 
-def _fetch_linerlib_zip():
+def _fetch_linerlib_zip(stats: Stats) -> ContextManager[zipfile.ZipFile]:
     filename = os.path.join(tempfile.gettempdir(), "linerlib.zip")
 
     if not os.path.exists(filename):
-        # get data
-        url = "https://github.com/blof/LINERLIB/archive/master.zip"
-        headers = {"Accept": "application/zip"}
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req) as response:
-            with open(filename, "wb") as out_file:
-                shutil.copyfileobj(response, out_file)
-
-    zf = zipfile.ZipFile(filename, "r")
+        with stats.stage("download") as record:
+            # get data
+            url = "https://github.com/blof/LINERLIB/archive/master.zip"
+            headers = {"Accept": "application/zip"}
+            req = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(req) as response:
+                with open(filename, "wb") as out_file:
+                    shutil.copyfileobj(response, out_file)
+            record["bytes"] += os.path.getsize(filename)
+
+    with stats.stage("open"):
+        zf = cache.open_archive(filename, zipfile.ZipFile)
 
     return zf
 
@@ -64,7 +69,27 @@ def _convertToNumeric(key, value):
     return value
 
 
-def fetch_linerlib(instance: str = None, return_raw=True) -> Bunch:
+def _parse_csv(zf: zipfile.ZipFile, instancefile: str, stats: Stats) -> Dict[str, Any]:
+    key = ("fetch_linerlib", instancefile)
+    d: Dict[str, Any] = cache.get(key)
+    if d is not None:
+        return d
+
+    with stats.stage("parse") as record:
+        with zf.open(instancefile) as f:
+            reader = csv.DictReader(io.TextIOWrapper(f, "utf-8"), delimiter="\t")
+            d = {k: [] for k in reader.fieldnames}
+            for row in reader:
+                [d[k].append(_convertToNumeric(k, v)) for k, v in row.items()]
+        record["bytes"] += zf.getinfo(instancefile).file_size
+
+    cache.put(key, d)
+    return d
+
+
+def fetch_linerlib(
+    instance: str = None, return_raw=True, instances: List[str] = None
+) -> Bunch:
     """
     Fetches data sets from the GitHub [repository](https://github.com/blof/LINERLIB) of
     [LINERLIB](https://linerlib.org).
@@ -79,12 +104,19 @@ def fetch_linerlib(instance: str = None, return_raw=True) -> Bunch:
         instance: String identifier of the instance. If `None` the entire set is
             returned.
         return_raw: If `True` returns the raw data as a tuple
+        instances: String identifiers of several instances, which are resolved in
+            one pass over the archive and returned in `data` in the given order.
 
     Returns:
         Network and demand information.
     """
 
-    zf = _fetch_linerlib_zip()
+    if instance and instances is not None:
+        raise ValueError("pass either 'instance' or 'instances'")
+
+    names = [instance] if instance else instances
+
+    stats = Stats("fetch_linerlib")
 
     files: Dict[str, Dict[str, Any]] = {}
 
@@ -94,48 +126,60 @@ def fetch_linerlib(instance: str = None, return_raw=True) -> Bunch:
 
     okInstancePrefix = ["Demand_", "fleet_", "transittime_revision/Demand_"]
 
-    for instancefile in zf.namelist():
-        if not (
-            instancefile.endswith(".csv")
-            and (
-                any([p in instancefile for p in okInstancePrefix])
-                or instancefile in [distFile, fleetFile]
-            )
-        ):
-            continue
-
-        instanceDemandFile = os.path.join(dataDir, f"Demand_{instance}.csv")
-        instanceDemandRevisedFile = os.path.join(
-            dataDir, f"transittime_revision/Demand_{instance}.csv"
-        )
-        instanceFleetFile = os.path.join(dataDir, f"fleet_{instance}.csv")
+    instanceFiles = _get_instance_files(dataDir, names)
 
-        if instance and instancefile not in [
-            instanceDemandFile,
-            instanceDemandRevisedFile,
-            instanceFleetFile,
-            distFile,
-            fleetFile,
-        ]:
-            continue
+    with _fetch_linerlib_zip(stats) as zf:
+        for instancefile in zf.namelist():
+            if not (
+                instancefile.endswith(".csv")
+                and (
+                    any([p in instancefile for p in okInstancePrefix])
+                    or instancefile in [distFile, fleetFile]
+                )
+            ):
+                continue
 
-        with zf.open(instancefile) as f:
-            reader = csv.DictReader(io.TextIOWrapper(f, "utf-8"), delimiter="\t")
-            d: Dict[str, Any] = {k: [] for k in reader.fieldnames}
-            for row in reader:
-                [d[k].append(_convertToNumeric(k, v)) for k, v in row.items()]
+            if instanceFiles is not None and instancefile not in instanceFiles:
+                continue
 
-            files[instancefile] = d
+            files[instancefile] = _parse_csv(zf, instancefile, stats)
 
-    bunch = Bunch(data=[], instance=None, DESCR="LINERLIB")
+    bunch = Bunch(data=[], instance=None, DESCR="LINERLIB", stats=stats)
 
     # format data
-    fleet = files[fleetFile]
-    del files[fleetFile]
+    fleet = files.pop(fleetFile)
+    distance = files.pop(distFile)
+
+    for k, v in _get_instances(files, names):
+        bunch["data"].append((k, v["Demand"], v["fleet"], fleet, distance))
+
+    if instance:
+        bunch["instance"] = bunch["data"][0]
+
+    return bunch
+
+
+def _get_instance_files(dataDir: str, names: Optional[List[str]]) -> Optional[Set[str]]:
+    if names is None:
+        return None
+
+    instanceFiles = {
+        os.path.join(dataDir, "dist_dense.csv"),
+        os.path.join(dataDir, "fleet_data.csv"),
+    }
+    for instanceName in names:
+        instanceFiles |= {
+            os.path.join(dataDir, f"Demand_{instanceName}.csv"),
+            os.path.join(dataDir, f"transittime_revision/Demand_{instanceName}.csv"),
+            os.path.join(dataDir, f"fleet_{instanceName}.csv"),
+        }
+
+    return instanceFiles
 
-    distance = files[distFile]
-    del files[distFile]
 
+def _get_instances(
+    files: Dict[str, Dict[str, Any]], names: Optional[List[str]]
+) -> List[Tuple[str, Dict[str, Any]]]:
     consolidatedDataDict: Dict[str, Dict[str, Any]] = {}
 
     # per instance
@@ -148,18 +192,60 @@ def fetch_linerlib(instance: str = None, return_raw=True) -> Bunch:
 
         consolidatedDataDict[name][dataType] = v
 
-    bunch["data"] = [
-        (k, v["Demand"], v["fleet"], fleet, distance)
-        for k, v in consolidatedDataDict.items()
-    ]
+    missing = [k for k in names or [] if k not in consolidatedDataDict]
+    if missing:
+        raise KeyError(f"no instances {missing} in LINERLIB")
 
-    if instance:
-        bunch["instance"] = bunch["data"][0]
+    keys = list(consolidatedDataDict) if names is None else names
 
-    return bunch
+    return [(k, consolidatedDataDict[k]) for k in keys]
+
+
+def _parse_rotations(f) -> Tuple[List[List[str]], List[float], List[int]]:
+    # data per service
+    rotations = []
+    speed = []
+    capacities = []
+
+    line = f.readline().decode("utf-8")
+
+    while line:
+        # rotations
+        if line.startswith("service"):
+            capacityLine = f.readline().decode("utf-8")
+            capacityValue = int(capacityLine.strip().replace("capacity", ""))
+            capacities.append(capacityValue)
+            f.readline()  # num vessels
+
+            rotation = []
+            portLine = f.readline().decode("utf-8")
+            while portLine:
+                if portLine.startswith(" Butterfly"):
+                    portLine = f.readline().decode("utf-8")
+                    continue
+                if portLine == "\n":
+                    break
+
+                portLineArray = portLine.split("\t")
+                portValue = portLineArray[1].strip()
+                rotation.append(portValue)
+
+                portLine = f.readline().decode("utf-8")
+            rotations.append(rotation)
+
+            speedLine = f.readline().decode("utf-8")
+            speedValue = float(speedLine.strip().replace("speed", ""))
+            speed.append(speedValue)
 
+        # continue
+        line = f.readline().decode("utf-8")
 
-def fetch_linerlib_rotations(instance: str = None, return_raw=True) -> Bunch:
+    return rotations, speed, capacities
+
+
+def fetch_linerlib_rotations(
+    instance: str = None, return_raw=True, instances: List[str] = None
+) -> Bunch:
     """
     Gets the networks calculated in ["A Matheuristic for the Liner Shipping Network
     Design Problem with Transit Time Restrictions"](
@@ -178,74 +264,68 @@ def fetch_linerlib_rotations(instance: str = None, return_raw=True) -> Bunch:
 
     Parameters:
         instance: String identifier of the instance. If `None` the entire set is
-            returned.
+            returned. All networks whose name starts with it are returned in
+            `data`, e.g. every `Baltic_*` network for `Baltic`, and the first one
+            in `instance`.
 
             Note: Instance `Mediterranean` is called `Med`
 
         return_raw: If `True` returns the raw data as a tuple
+        instances: String identifiers of several instances, which are resolved in
+            one pass over the archive. The networks starting with each of them are
+            returned in `data` in the given order.
 
     Returns:
         The rotations, speed and capacities of the network.
     """
-    zf = _fetch_linerlib_zip()
+    if instance and instances is not None:
+        raise ValueError("pass either 'instance' or 'instances'")
 
-    files: Dict[str, Tuple[List[str], List[str], List[str]]] = {}
+    names = [instance] if instance else instances
 
-    dataDir = "LINERLIB-master/results/BrouerDesaulniersPisinger2014/"
+    stats = Stats("fetch_linerlib_rotations")
 
-    for instancefile in zf.namelist():
-        if not instancefile.endswith(".log") or not instancefile.startswith(dataDir):
-            continue
-
-        if instance and not instancefile[len(dataDir) :].startswith(instance):
-            continue
-
-        with zf.open(instancefile, "r") as f:
-            name = instancefile[len(dataDir) : instancefile.rfind(".")]
+    files: Dict[str, Tuple[List[List[str]], List[float], List[int]]] = {}
 
-            # data per service
-            rotations = []
-            speed = []
-            capacities = []
+    dataDir = "LINERLIB-master/results/BrouerDesaulniersPisinger2014/"
 
-            line = f.readline().decode("utf-8")
+    with _fetch_linerlib_zip(stats) as zf:
+        for instancefile in zf.namelist():
+            if not instancefile.startswith(dataDir):
+                continue
 
-            while line:
-                # rotations
-                if line.startswith("service"):
-                    capacityLine = f.readline().decode("utf-8")
-                    capacityValue = int(capacityLine.strip().replace("capacity", ""))
-                    capacities.append(capacityValue)
-                    f.readline()  # num vessels
+            if not instancefile.endswith(".log"):
+                continue
 
-                    rotation = []
-                    portLine = f.readline().decode("utf-8")
-                    while portLine:
-                        if portLine.startswith(" Butterfly"):
-                            portLine = f.readline().decode("utf-8")
-                            continue
-                        if portLine == "\n":
-                            break
+            name = instancefile[len(dataDir) : instancefile.rfind(".")]
 
-                        portLineArray = portLine.split("\t")
-                        portValue = portLineArray[1].strip()
-                        rotation.append(portValue)
+            if names is not None and not any(name.startswith(k) for k in names):
+                continue
 
-                        portLine = f.readline().decode("utf-8")
-                    rotations.append(rotation)
+            key = ("fetch_linerlib_rotations", instancefile)
+            files[name] = cache.get(key)
+            if files[name] is None:
+                with stats.stage("parse") as record:
+                    with zf.open(instancefile, "r") as f:
+                        files[name] = _parse_rotations(f)
+                    record["bytes"] += zf.getinfo(instancefile).file_size
+                cache.put(key, files[name])
 
-                    speedLine = f.readline().decode("utf-8")
-                    speedValue = float(speedLine.strip().replace("speed", ""))
-                    speed.append(speedValue)
+    bunch = Bunch(data=[], instance=None, DESCR="LINERLIB rotations", stats=stats)
 
-                # continue
-                line = f.readline().decode("utf-8")
+    if names is None:
+        keys = list(files)
+    else:
+        # all rotations starting with every requested identifier
+        matches = [[k for k in files if k.startswith(n)] for n in names]
 
-            files[name] = (rotations, speed, capacities)
+        missing = [n for n, found in zip(names, matches) if not found]
+        if missing:
+            raise KeyError(f"no instances {missing} in LINERLIB rotations")
 
-    bunch = Bunch(data=[], instance=None, DESCR="LINERLIB rotations")
+        keys = [k for found in matches for k in found]
 
-    bunch["data"] = [(k, v[0], v[1], v[2]) for k, v in files.items()]
+    bunch["data"] = [(k, files[k][0], files[k][1], files[k][2]) for k in keys]
 
     if instance:
         bunch["instance"] = bunch["data"][0]
@@ -253,6 +333,15 @@ def fetch_linerlib_rotations(instance: str = None, return_raw=True) -> Bunch:
     return bunch
 
 
+def _timed(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.stats.stage(method.__name__):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class GraphBuilder:
     """
     Convinience builder class for constructiong graphs for liner shipping networks.
@@ -277,6 +366,8 @@ class GraphBuilder:
     """The edge transshipment times."""
     capacity: List[int] = []
     """The edge capacities."""
+    stats: Stats
+    """Per-method timing and memory statistics."""
 
     def __init__(self, data, network):
         """
@@ -293,7 +384,9 @@ class GraphBuilder:
         self.rotationName, self.rotations, self.speed, self.capacities = network[
             "instance"
         ]
+        self.stats = Stats("GraphBuilder")
 
+    @_timed
     def portCallNodes(self) -> List[str]:
         """
         The port call nodes are ports reached by a rotation.
@@ -305,6 +398,7 @@ class GraphBuilder:
             set([f"C{i}_{r}" for i, rs in enumerate(self.rotations) for r in rs])
         )
 
+    @_timed
     def originNodes(self) -> List[str]:
         """
         The origin nodes for the commodities.
@@ -317,6 +411,7 @@ class GraphBuilder:
             for i in range(len(self.demand["Destination"]))
         ]
 
+    @_timed
     def destinationNodes(self) -> List[str]:
         """
         The destination nodes for the commodities.
@@ -329,6 +424,7 @@ class GraphBuilder:
             for i in range(len(self.demand["Destination"]))
         ]
 
+    @_timed
     def voyageEdges(self) -> List[Tuple[str, str]]:
         """
         The voyage edges.
@@ -354,6 +450,7 @@ class GraphBuilder:
 
         return edges
 
+    @_timed
     def transitEdges(self) -> List[Tuple[str, str]]:
         """
         The transshipment edges.
@@ -375,6 +472,7 @@ class GraphBuilder:
 
         return edges
 
+    @_timed
     def loadEdges(self) -> List[Tuple[str, str]]:
         """
         The load/unload edges.
@@ -400,6 +498,7 @@ class GraphBuilder:
 
         return edges
 
+    @_timed
     def forfeitEdges(self) -> List[Tuple[str, str]]:
         """
         The forfeit edges.
@@ -1,13 +1,21 @@
+import array
+import bisect
+import itertools
 import tarfile
 import os
 import urllib.request
 import shutil
 import tempfile
-from or_datasets import Bunch
-from typing import Dict
+from or_datasets import Bunch, cache
+from or_datasets.lazy import LazyData
+from or_datasets.stats import Stats
+from typing import ContextManager, Dict, Iterator, List, Tuple
 
+coreSize = 50
+"""The number of items in the core of derived knapsack data."""
 
-def _fetch_file(key: str) -> tarfile.TarFile:
+
+def _fetch_file(key: str, stats: Stats) -> ContextManager[tarfile.TarFile]:
     lookup = {
         "small": "smallcoeff_pisinger.tgz",
         "large": "largecoeff_pisinger.tgz",
@@ -17,59 +25,78 @@ def _fetch_file(key: str) -> tarfile.TarFile:
     filename = os.path.join(tempfile.gettempdir(), lookup[key])
 
     if not os.path.exists(filename):
-        # get data
-        url = f"http://www.diku.dk/~pisinger/{lookup[key]}"
-        headers = {"Accept": "application/zip"}
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req) as response:
-            with open(filename, "wb") as out_file:
-                shutil.copyfileobj(response, out_file)
+        with stats.stage("download") as record:
+            # get data
+            url = f"http://www.diku.dk/~pisinger/{lookup[key]}"
+            headers = {"Accept": "application/zip"}
+            req = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(req) as response:
+                with open(filename, "wb") as out_file:
+                    shutil.copyfileobj(response, out_file)
+            record["bytes"] += os.path.getsize(filename)
 
-    tf = tarfile.open(filename, "r")
+    with stats.stage("open"):
+        tf = cache.open_archive(filename, tarfile.open)
 
     return tf
 
 
-def _parse_file(
-    tf: tarfile.TarFile, instance: str, member: tarfile.TarInfo, bunch: Dict
-) -> None:
-    with tf.extractfile(member) as fh:
-        # 100 instances per file
-        for i in range(100):
-            name = fh.readline().decode("utf-8").strip("\n")
+def _iter_file(fh, skip: int = 0) -> Iterator[Tuple]:
+    # 100 instances per file
+    for i in range(100):
+        name = fh.readline().decode("utf-8").strip("\n")
+        if not name:
+            return
+
+        n = int(fh.readline().decode("utf-8").strip("\n").split()[1])
+
+        if i < skip:
+            # capacity, optimum, time, items and 2 trailing lines
+            for _ in range(n + 5):
+                fh.readline()
+            continue
+
+        c = int(fh.readline().decode("utf-8").strip("\n").split()[1])
+        z = int(fh.readline().decode("utf-8").strip("\n").split()[1])
+        fh.readline()  # time
+        # edges
+        p = []
+        w = []
+        x = []
+
+        for _ in range(n):
+            item, profit, weight, xValue = [
+                int(x) for x in fh.readline().decode("utf-8").strip("\n").split(",")
+            ]
+            p.append(profit)
+            w.append(weight)
+            x.append(xValue)
 
-            n = int(fh.readline().decode("utf-8").strip("\n").split()[1])
-            c = int(fh.readline().decode("utf-8").strip("\n").split()[1])
-            z = int(fh.readline().decode("utf-8").strip("\n").split()[1])
-            fh.readline()  # time
-            # edges
-            p = []
-            w = []
-            x = []
+        fh.readline()
+        fh.readline()
 
-            for i in range(n):
-                item, profit, weight, xValue = [
-                    int(x) for x in fh.readline().decode("utf-8").strip("\n").split(",")
-                ]
-                p.append(profit)
-                w.append(weight)
-                x.append(xValue)
+        yield (name, n, c, p, w, z, x)
 
-            fh.readline()
-            fh.readline()
 
-            data = (name, n, c, p, w, z, x)
+def _parse_file(fh, instance: str) -> List[Tuple]:
+    if not instance:
+        return list(_iter_file(fh))
 
-            if name == instance:
-                bunch["data"].append(data)
-                bunch["instance"] = data
-                break
+    for data in _iter_file(fh):
+        if data[0] == instance:
+            return [data]
 
-            if not instance:
-                bunch["data"].append(data)
+    return []
 
 
-def fetch_knapsack(name: str, instance: str = None, return_raw=True) -> Bunch:
+def fetch_knapsack(
+    name: str,
+    instance: str = None,
+    return_raw=True,
+    derived=False,
+    lazy=False,
+    instances: List[str] = None,
+) -> Bunch:
     """
     Fetches knapsack data sets from http://hjemmesider.diku.dk/~pisinger/codes.html
 
@@ -78,9 +105,10 @@ def fetch_knapsack(name: str, instance: str = None, return_raw=True) -> Bunch:
     Usage for getting a Knapsack instance is:
     ```python
     bunch = fetch_knapsack(
-        "small", instance="knapPI_1_50_1000-1"
+        "small", instance="knapPI_1_50_1000-1", derived=True
     )
     name, n, c, p, w, z, x = bunch["instance"]
+    order, s, U, core = bunch["derived"][0]
     ```
 
     Parameters:
@@ -89,33 +117,295 @@ def fetch_knapsack(name: str, instance: str = None, return_raw=True) -> Bunch:
             returned.
 
         return_raw: If `True` returns the raw data as a tuple
+        derived: If `True` adds data derived from every instance to
+            `bunch["derived"]`, see [get_derived][or_datasets.pisinger.get_derived].
+            It is cached next to the instance.
+        lazy: If `True` and the entire set is fetched, `data` and `derived` are
+            [LazyData][or_datasets.lazy.LazyData] sequences that parse an instance
+            when it is accessed.
+        instances: String identifiers of several instances, which are resolved in
+            one pass over the archive and returned in `data` in the given order.
 
     Returns:
-        Network information.
+        Network information. Parsed instances are kept in the in-process
+        [cache][or_datasets.cache], and every fetch returns its own copy.
     """
 
-    tf = _fetch_file(name)
+    stats = Stats("fetch_knapsack")
+    bunch = Bunch(data=[], instance=None, DESCR="Knapsack", stats=stats)
 
-    members = []
-    if instance:
-        for instancefile in tf.getnames():
-            if instancefile.endswith(".txt"):
-                continue
+    if instance and instances is not None:
+        raise ValueError("pass either 'instance' or 'instances'")
+
+    if instances is not None:
+        found = _get_batch(name, instances, stats)
+
+        missing = [i for i in instances if i not in found]
+        if missing:
+            raise KeyError(f"no instances {missing} in '{name}'")
 
-            if instance:
-                rawInstanceFileName = "_".join(instance.split("_")[:-1])
-                if instancefile == f"{rawInstanceFileName}.csv":
-                    members = [tf.getmember(instancefile)]
-                    break
+        bunch["data"] = [found[i] for i in instances]
+    elif lazy and not instance:
+        bunch["data"] = _get_lazy(name, stats)
+    elif instance:
+        bunch["data"] = _get_instance(name, instance, stats)
     else:
-        members = tf.getmembers()
+        bunch["data"] = _get_set(name, stats)
 
-    bunch = Bunch(data=[], instance=None, DESCR="Knapsack")
-    for member in members:
-        if member.name.endswith(".txt"):
-            continue
+    if instance and bunch["data"]:
+        bunch["instance"] = bunch["data"][0]
 
-        _parse_file(tf, instance, member, bunch)
+    if derived and lazy and not instance and instances is None:
+        data = bunch["data"]
+        bunch["derived"] = lazyDerived = LazyData(
+            data.keys,
+            lambda key: _get_derived(name, data.load(key), stats, lazyDerived.keep),
+            iterate=lambda keys: (
+                _get_derived(name, values, stats, lazyDerived.keep) for values in data
+            ),
+        )
+    elif derived:
+        bunch["derived"] = [_get_derived(name, data, stats) for data in bunch["data"]]
 
-    tf.close()
     return bunch
+
+
+def _get_derived(name: str, data: Tuple, stats: Stats, keep=True):
+    key = ("fetch_knapsack", name, _get_instance_file(data[0]), data[0], "derived")
+    values = cache.get(key)
+    if values is None:
+        with stats.stage("derive"):
+            values = get_derived(data)
+        if keep:
+            cache.put(key, values)
+
+    return values
+
+
+def _get_file(
+    tf: tarfile.TarFile, name: str, member: tarfile.TarInfo, stats: Stats
+) -> List[Tuple]:
+    # instances are cached one by one next to the names of the file they are in
+    key = ("fetch_knapsack", name, member.name)
+    names = cache.get(key)
+    if names is not None:
+        instances = [cache.get(key + (instance,)) for instance in names]
+        if None not in instances:
+            return instances
+
+    with stats.stage("parse") as record:
+        with tf.extractfile(member) as fh:
+            instances = _parse_file(fh, None)
+            record["bytes"] += fh.tell()
+
+    for data in instances:
+        cache.put(key + (data[0],), data)
+    cache.put(key, [data[0] for data in instances])
+
+    return instances
+
+
+def _get_lazy(name: str, stats: Stats) -> LazyData:
+    with _fetch_file(name, stats) as tf:
+        with stats.stage("scan"):
+            members = tf.getmembers()
+
+    # 100 instances per file
+    keys = [
+        (member.name, i)
+        for member in members
+        if not member.name.endswith(".txt")
+        for i in range(100)
+    ]
+
+    lazy = LazyData(
+        keys,
+        lambda key: _load(name, *key, stats, lazy.keep),
+        iterate=lambda keys: _iter_set(name, keys, stats, lazy.keep),
+    )
+
+    return lazy
+
+
+def _stream(name: str, instancefile: str, skip: int, stats: Stats) -> Iterator[Tuple]:
+    with _fetch_file(name, stats) as tf:
+        filename = tf.name
+        member = tf.getmember(instancefile)
+
+    # a handle of its own stays open while the caller iterates and leaves the
+    # cached one to other readers
+    with tarfile.open(filename) as tf, tf.extractfile(member) as fh:
+        instances = _iter_file(fh, skip)
+        while True:
+            with stats.stage("parse") as record:
+                start = fh.tell()
+                data = next(instances, None)
+                record["bytes"] += fh.tell() - start
+
+            if data is None:
+                return
+
+            yield data
+
+
+def _load(name: str, instancefile: str, i: int, stats: Stats, keep: bool) -> Tuple:
+    key = ("fetch_knapsack", name, instancefile)
+
+    names = cache.get(key)
+    data = cache.get(key + (names[i],)) if names is not None else None
+    if data is not None:
+        return data
+
+    # instances before the requested one are skipped without parsing their items
+    instances = _stream(name, instancefile, i, stats)
+    data = next(instances, None)
+    instances.close()
+
+    if data is None:
+        raise IndexError(f"no instance {i} in '{instancefile}'")
+
+    if keep:
+        cache.put(key + (data[0],), data)
+
+    return data
+
+
+def _iter_set(name: str, keys: List[Tuple], stats: Stats, keep: bool):
+    # one forward pass over every instance file
+    for instancefile in dict.fromkeys(instancefile for instancefile, _ in keys):
+        yield from _iter_member(name, instancefile, stats, keep)
+
+
+def _iter_member(name: str, instancefile: str, stats: Stats, keep: bool):
+    key = ("fetch_knapsack", name, instancefile)
+
+    # cached instances are yielded until the first one that was evicted
+    names = cache.get(key) or []
+    skip = 0
+    for instance in names:
+        data = cache.get(key + (instance,))
+        if data is None:
+            break
+
+        skip += 1
+        yield data
+
+    if names and skip == len(names):
+        return
+
+    names = names[:skip]
+    for data in _stream(name, instancefile, skip, stats):
+        if keep:
+            cache.put(key + (data[0],), data)
+        names.append(data[0])
+
+        yield data
+
+    if keep:
+        cache.put(key, names)
+
+
+def _get_instance_file(instance: str) -> str:
+    rawInstanceFileName = "_".join(instance.split("_")[:-1])
+    return f"{rawInstanceFileName}.csv"
+
+
+def _get_batch(name: str, names: List[str], stats: Stats) -> Dict[str, Tuple]:
+    wanted = set(names)
+    instancefiles = set(_get_instance_file(instance) for instance in wanted)
+
+    found: Dict[str, Tuple] = {}
+    if not wanted:
+        return found
+
+    with _fetch_file(name, stats) as tf:
+        with stats.stage("scan"):
+            members = tf.getmembers()
+
+        # a single pass in archive order reads every requested file once
+        for member in members:
+            if member.name not in instancefiles:
+                continue
+
+            for data in _get_file(tf, name, member, stats):
+                if data[0] in wanted:
+                    found[data[0]] = data
+
+    return found
+
+
+def _get_instance(name: str, instance: str, stats: Stats) -> List[Tuple]:
+    instancefile = _get_instance_file(instance)
+    key = ("fetch_knapsack", name, instancefile, instance)
+
+    # a cached instance needs neither download nor archive
+    data = cache.get(key)
+    if data is not None:
+        return [data]
+
+    with _fetch_file(name, stats) as tf:
+        with stats.stage("scan"):
+            instancefiles = tf.getnames()
+
+        if instancefile not in instancefiles:
+            return []
+
+        with stats.stage("parse") as record:
+            with tf.extractfile(instancefile) as fh:
+                instances = _parse_file(fh, instance)
+                record["bytes"] += fh.tell()
+
+    if instances:
+        cache.put(key, instances[0])
+
+    return instances
+
+
+def _get_set(name: str, stats: Stats) -> List[Tuple]:
+    instances = []
+    with _fetch_file(name, stats) as tf:
+        with stats.stage("scan"):
+            members = tf.getmembers()
+
+        for member in members:
+            if not member.name.endswith(".txt"):
+                instances += _get_file(tf, name, member, stats)
+
+    return instances
+
+
+def get_derived(instance: Tuple) -> Tuple[array.array, int, int, array.array]:
+    """
+    Computes the data most knapsack algorithms start from.
+
+    Usage for an instance is:
+    ```python
+    order, s, U, core = get_derived(bunch["instance"])
+    ```
+
+    Parameters:
+        instance: Tuple `(name, n, c, p, w, z, x)` of a knapsack instance.
+
+    Returns:
+        The items sorted by decreasing efficiency `p / w`, the position `s` of the
+        break item in that order (`n` if all items fit), the Dantzig upper bound `U`
+        and the core, i.e. the up to `coreSize` items around the break item in
+        efficiency order. Item orders are `array.array("i")` of item indices.
+    """
+    name, n, c, p, w, z, x = instance
+
+    order = sorted(range(n), key=[-p[j] / w[j] for j in range(n)].__getitem__)
+
+    # first item in efficiency order that does not fit
+    cumulative = list(itertools.accumulate(w[j] for j in order))
+    s = bisect.bisect_right(cumulative, c)
+
+    U = sum(p[j] for j in order[:s])
+    if s < n:
+        residual = c - (cumulative[s - 1] if s > 0 else 0)
+        U += residual * p[order[s]] // w[order[s]]
+
+    start = max(0, min(s - coreSize // 2, n - coreSize))
+    core = order[start : start + coreSize]
+
+    return array.array("i", order), s, U, array.array("i", core)
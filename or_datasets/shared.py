@@ -0,0 +1,129 @@
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python 3.7
+    raise ImportError(
+        "or_datasets.shared requires Python 3.8 for multiprocessing.shared_memory"
+    ) from None
+from typing import Any, Dict, List, Optional, Tuple
+
+from or_datasets import _arrays
+
+
+class SharedInstance:
+    """
+    Handle to an instance published in a shared memory block.
+
+    The handle is small and picklable, so it can be passed to the workers of a
+    `multiprocessing` pool, which attach to the block instead of receiving their own
+    copy of the instance.
+
+    ```python
+    bunch = fetch_vrp_rep("solomon-1987-r1", instance="R101_025")
+    handle = publish(bunch["instance"])
+
+    # in a worker
+    name, n, E, c, d, Q, t, a, b, x, y = handle.attach()
+    ...
+    handle.close()
+
+    # in the publishing process once all workers are done
+    handle.unlink()
+    ```
+
+    Numeric lists are attached as read-only `memoryview`s and lists of tuples, like
+    the edges `E`, as read-only sequences of tuples. Requires Python 3.8.
+    """
+
+    def __init__(self, name: str, specs: List[Dict[str, Any]]):
+        """
+        Initialize the handle.
+
+        Parameters:
+            name: Name of the shared memory block.
+            specs: Layout of the instance fields in the block.
+        """
+        self.name = name
+        self.specs = specs
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._views: List[memoryview] = []
+
+    def __getstate__(self):
+        return {"name": self.name, "specs": self.specs}
+
+    def __setstate__(self, state):
+        self.__init__(state["name"], state["specs"])
+
+    def __enter__(self) -> Tuple:
+        return self.attach()
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def attach(self) -> Tuple:
+        """
+        Attaches to the shared memory block.
+
+        Returns:
+            The instance tuple with zero-copy read-only views of the numeric fields.
+        """
+        if self._shm is None:
+            self._shm = shared_memory.SharedMemory(name=self.name)
+
+        instance = _arrays.unpack(self.specs, self._shm.buf)
+        self._views += _arrays.views(instance)
+
+        return instance
+
+    def close(self) -> None:
+        """
+        Detaches from the shared memory block. The views returned by
+        [attach][or_datasets.shared.SharedInstance.attach] are released and can not
+        be used anymore. Views derived from them, e.g. `memoryview`s of slices, must
+        be released first.
+        """
+        for view in self._views:
+            view.release()
+        self._views = []
+
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+    def unlink(self) -> None:
+        """
+        Detaches from and frees the shared memory block. Only call this from the
+        publishing process once no worker uses the instance anymore.
+        """
+        if self._shm is None:
+            self._shm = shared_memory.SharedMemory(name=self.name)
+
+        shm = self._shm
+        self.close()
+        shm.unlink()
+
+
+def publish(instance: Tuple) -> SharedInstance:
+    """
+    Publishes an instance, e.g. `bunch["instance"]` of
+    [fetch_vrp_rep][or_datasets.vrp_rep.fetch_vrp_rep] or
+    [fetch_knapsack][or_datasets.pisinger.fetch_knapsack], in a shared memory block.
+
+    Numeric lists such as `c`, `t`, `p` and `w` and lists of int tuples such as the
+    edges are copied into the block once. Names and scalars travel with the handle.
+
+    Parameters:
+        instance: The instance tuple.
+
+    Returns:
+        The handle to pass to workers. The block lives until
+        [unlink][or_datasets.shared.SharedInstance.unlink] is called.
+    """
+    specs, size, chunks = _arrays.pack(instance)
+
+    # blocks can not be empty
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    _arrays.write(shm.buf, chunks)
+
+    handle = SharedInstance(shm.name, specs)
+    handle._shm = shm
+    return handle
@@ -0,0 +1,152 @@
+import contextlib
+import logging
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List
+
+logger = logging.getLogger("or_datasets")
+
+_hooks: List[Callable[[str, str, Dict[str, Any]], None]] = []
+
+_traceMemory = False
+
+# number of stages running in any thread, as the traced peak is process-wide
+_active = 0
+_activeLock = threading.Lock()
+
+
+def trace_memory(enabled: bool = True) -> None:
+    """
+    Enables recording the peak allocation of fetch stages.
+
+    This requires `tracemalloc` to be tracing and Python 3.9, and resets its peak
+    with `tracemalloc.reset_peak()` at the start of every stage, so do not enable
+    it while measuring the peak of your own code. Disabled by default.
+
+    Parameters:
+        enabled: If `True` peaks are recorded.
+    """
+    global _traceMemory
+    _traceMemory = enabled
+
+
+def add_hook(hook: Callable[[str, str, Dict[str, Any]], None]) -> None:
+    """
+    Registers a callback that is called whenever a fetch stage finishes.
+
+    The callback receives the name of the fetcher, the name of the stage and the
+    stage record with the keys `time`, `bytes` and `peak`.
+
+    ```python
+    add_hook(lambda fetcher, stage, record: print(fetcher, stage, record))
+    ```
+
+    Parameters:
+        hook: The callback.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[str, str, Dict[str, Any]], None]) -> None:
+    """
+    Unregisters a callback added with [add_hook][or_datasets.stats.add_hook].
+
+    Parameters:
+        hook: The callback.
+    """
+    _hooks.remove(hook)
+
+
+class Stats(dict):
+    """
+    Per-stage timing and memory statistics of a fetch.
+
+    Maps a stage name, e.g. `download`, `open`, `parse` or `distance`, to a record
+    accumulated over all calls of that stage:
+
+    Option | Type | Description
+    ------ | ---- | -----------
+    calls | int | Number of times the stage was entered
+    time | float | Wall time in seconds
+    bytes | int | Bytes read during the stage
+    peak | Optional[int] | Peak traced allocation above the stage start in bytes
+
+    The peak is `None` unless enabled with
+    [trace_memory][or_datasets.stats.trace_memory] while `tracemalloc` is tracing.
+    It is also `None` for stages that start while another stage is running, e.g.
+    nested stages, as the peak can not be reset for them.
+    Every finished stage is also logged on the `or_datasets` logger at debug level.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the statistics.
+
+        Parameters:
+            name: Name of the fetcher or builder being instrumented.
+        """
+        super().__init__()
+        self.name = name
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Measures a stage. The yielded record can be used to count bytes read.
+
+        ```python
+        with stats.stage("parse") as record:
+            record["bytes"] += len(buffer)
+        ```
+
+        Parameters:
+            name: Name of the stage.
+        """
+        global _active
+
+        record: Dict[str, Any] = {"time": 0.0, "bytes": 0, "peak": None}
+        with _activeLock:
+            # a running stage must keep its peak, and Python 3.8 can not reset it
+            tracing = (
+                _traceMemory
+                and tracemalloc.is_tracing()
+                and hasattr(tracemalloc, "reset_peak")
+                and _active == 0
+            )
+            if tracing:
+                tracemalloc.reset_peak()
+            _active += 1
+        baseline = tracemalloc.get_traced_memory()[0] if tracing else 0
+
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["time"] = time.perf_counter() - start
+            with _activeLock:
+                _active -= 1
+            if tracing:
+                record["peak"] = tracemalloc.get_traced_memory()[1] - baseline
+
+            self._add(name, record)
+
+    def _add(self, name: str, record: Dict[str, Any]) -> None:
+        total = self.setdefault(
+            name, {"calls": 0, "time": 0.0, "bytes": 0, "peak": None}
+        )
+        total["calls"] += 1
+        total["time"] += record["time"]
+        total["bytes"] += record["bytes"]
+        if record["peak"] is not None:
+            total["peak"] = max(total["peak"] or 0, record["peak"])
+
+        logger.debug(
+            "%s: %s took %.6fs, read %d bytes, peak %s bytes",
+            self.name,
+            name,
+            record["time"],
+            record["bytes"],
+            record["peak"],
+        )
+        for hook in _hooks:
+            hook(self.name, name, record)
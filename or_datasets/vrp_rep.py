@@ -1,4 +1,4 @@
-import math
+import array
 import zipfile
 import os
 import xml.etree.ElementTree as ElementTree
@@ -6,20 +6,31 @@ import copy
 import urllib.request
 import shutil
 import tempfile
-from or_datasets import Bunch
-from typing import List, Tuple, Optional
-
-
-def fetch_vrp_rep(name: str, instance: str = None, return_raw=True) -> Bunch:
+from or_datasets import Bunch, cache
+from or_datasets._arcs import get_arcs
+from or_datasets.lazy import LazyData
+from or_datasets.stats import Stats
+from typing import ContextManager, Dict, List, Tuple, Optional
+
+
+def fetch_vrp_rep(
+    name: str,
+    instance: str = None,
+    return_raw=True,
+    derived=False,
+    lazy=False,
+    instances: List[str] = None,
+) -> Bunch:
     """
     Fetches data sets from [VRP-REP](http://www.vrp-rep.org).
 
     Usage for getting a VRPTW instance is:
     ```python
     bunch = fetch_vrp_rep(
-        "solomon-1987-r1", instance="R101_025"
+        "solomon-1987-r1", instance="R101_025", derived=True
     )
     name, n, E, c, d, Q, t, a, b, x, y = bunch["instance"]
+    neighbours, tw, load = bunch["derived"][0]
     ```
 
     Parameters:
@@ -28,66 +39,46 @@ def fetch_vrp_rep(name: str, instance: str = None, return_raw=True) -> Bunch:
             returned.
 
         return_raw: If `True` returns the raw data as a tuple
+        derived: If `True` adds neighbour lists and compatibility masks of every
+            instance to `bunch["derived"]`, see
+            [get_derived][or_datasets.vrp_rep.get_derived]. They are cached next to
+            the instance.
+        lazy: If `True` and the entire set is fetched, `data` and `derived` are
+            [LazyData][or_datasets.lazy.LazyData] sequences that parse an instance
+            when it is accessed.
+        instances: String identifiers of several instances, which are resolved in
+            one pass over the archive and returned in `data` in the given order.
 
     Returns:
-        Network information.
+        Network information. Parsed instances are kept in the in-process
+        [cache][or_datasets.cache], and every fetch returns its own copy.
     """
 
-    # http://www.vrp-rep.org/datasets/download/solomon-1987-c1.zip
-
-    filename = os.path.join(tempfile.gettempdir(), f"{name}.zip")
-
-    if not os.path.exists(filename):
-        url = f"http://www.vrp-rep.org/datasets/download/{name}.zip"
-        headers = {"Accept": "application/xml"}
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req) as response:
-            with open(filename, "wb") as out_file:
-                shutil.copyfileobj(response, out_file)
-
-    zf = zipfile.ZipFile(filename, "r")
-
-    trees = []
-    for instancefile in zf.namelist():
-        if not instancefile.endswith(".xml"):
-            continue
-
-        if instance:
-            if instancefile == f"{instance}.xml":
-                with zf.open(instancefile) as f:
-                    trees.append(ElementTree.parse(f))
-                    break
-        else:
-            with zf.open(instancefile) as f:
-                trees.append(ElementTree.parse(f))
-
-    bunch = Bunch(data=[], instance=None, DESCR="VRPTW")
-    for tree in trees:
-        root = tree.getroot()
-
-        instanceName: Optional[str] = _get_name(root)
+    stats = Stats("fetch_vrp_rep")
+    bunch = Bunch(data=[], instance=None, DESCR="VRPTW", stats=stats)
 
-        node_list = _get_node_list(root)
+    if instance and instances is not None:
+        raise ValueError("pass either 'instance' or 'instances'")
 
-        n: int = len(node_list)
+    names = [instance] if instance else instances
+    instancefiles: List[str] = []
 
-        # edges, distance, time
-        m, c, t, x, y = _get_distance(n, node_list)
-
-        # vehicle profile
-        fleet = root.find("fleet")
-        Q, T = _get_vehicle_profile(fleet)
+    if lazy and names is None:
+        bunch["data"] = _get_lazy(name, stats)
+    else:
+        found = _get_instances(name, names, stats)
 
-        # requests
-        requests = root.find("requests")
-        d, a, b = _get_requests(requests, n, m, t)
+        missing = [i for i in instances or [] if f"{i}.xml" not in found]
+        if missing:
+            raise KeyError(f"no instances {missing} in '{name}'")
 
-        # set tw for duplicate depot node
-        a[n - 1] = a[0]
-        b[n - 1] = T
+        if names is None:
+            instancefiles = list(found)
+        else:
+            instancefiles = [f"{i}.xml" for i in names if f"{i}.xml" in found]
 
         if return_raw:
-            data = (instanceName, n, m, c, d, Q, t, a, b, x, y)
+            bunch["data"] = [found[f] for f in instancefiles]
         else:
             # TODO
             # generate model based on data
@@ -97,14 +88,153 @@ def fetch_vrp_rep(name: str, instance: str = None, return_raw=True) -> Bunch:
             # data = Model(milp, mapping, graphs)
             pass
 
-        bunch["data"].append(data)
-
-        if instance:
-            bunch["instance"] = data
+    if instance and bunch["data"]:
+        bunch["instance"] = bunch["data"][0]
+
+    if derived and lazy and names is None:
+        data = bunch["data"]
+        bunch["derived"] = lazyDerived = LazyData(
+            data.keys,
+            lambda key: _get_derived(
+                name, key, data.load(key), stats, lazyDerived.keep
+            ),
+        )
+    elif derived:
+        bunch["derived"] = [
+            _get_derived(name, instancefile, data, stats)
+            for instancefile, data in zip(instancefiles, bunch["data"])
+        ]
 
     return bunch
 
 
+def _get_derived(name: str, instancefile: str, data: Tuple, stats: Stats, keep=True):
+    key = ("fetch_vrp_rep", name, instancefile, "derived")
+    values = cache.get(key)
+    if values is None:
+        with stats.stage("derive"):
+            values = get_derived(data)
+        if keep:
+            cache.put(key, values)
+
+    return values
+
+
+def _get_instance(
+    zf: zipfile.ZipFile, name: str, instancefile: str, stats: Stats, keep=True
+):
+    key = ("fetch_vrp_rep", name, instancefile)
+    data = cache.get(key)
+    if data is None:
+        data = _parse_instance(zf, instancefile, stats)
+        if keep:
+            cache.put(key, data)
+
+    return data
+
+
+def _get_lazy(name: str, stats: Stats) -> LazyData:
+    with _fetch_zip(name, stats) as zf:
+        keys = [f for f in zf.namelist() if f.endswith(".xml")]
+
+    def load(instancefile):
+        with _fetch_zip(name, stats) as zf:
+            return _get_instance(zf, name, instancefile, stats, lazy.keep)
+
+    lazy = LazyData(keys, load)
+
+    return lazy
+
+
+def _get_instances(
+    name: str, names: Optional[List[str]], stats: Stats
+) -> Dict[str, Tuple]:
+    found: Dict[str, Tuple] = {}
+    wanted = None
+    if names is not None:
+        wanted = set(f"{instance}.xml" for instance in names)
+
+        # cached instances need neither download nor archive
+        for instancefile in wanted:
+            data = cache.get(("fetch_vrp_rep", name, instancefile))
+            if data is not None:
+                found[instancefile] = data
+
+        if len(found) == len(wanted):
+            return found
+
+    with _fetch_zip(name, stats) as zf:
+        # a single pass over the archive resolves all requested instances
+        for instancefile in zf.namelist():
+            if not instancefile.endswith(".xml") or instancefile in found:
+                continue
+
+            if wanted is not None and instancefile not in wanted:
+                continue
+
+            found[instancefile] = _get_instance(zf, name, instancefile, stats)
+
+            if wanted is not None and len(found) == len(wanted):
+                break
+
+    return found
+
+
+def _fetch_zip(name: str, stats: Stats) -> ContextManager[zipfile.ZipFile]:
+    # http://www.vrp-rep.org/datasets/download/solomon-1987-c1.zip
+
+    filename = os.path.join(tempfile.gettempdir(), f"{name}.zip")
+
+    if not os.path.exists(filename):
+        with stats.stage("download") as record:
+            url = f"http://www.vrp-rep.org/datasets/download/{name}.zip"
+            headers = {"Accept": "application/xml"}
+            req = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(req) as response:
+                with open(filename, "wb") as out_file:
+                    shutil.copyfileobj(response, out_file)
+            record["bytes"] += os.path.getsize(filename)
+
+    with stats.stage("open"):
+        zf = cache.open_archive(filename, zipfile.ZipFile)
+
+    return zf
+
+
+def _parse_instance(zf: zipfile.ZipFile, instancefile: str, stats: Stats):
+    with stats.stage("parse") as record:
+        with zf.open(instancefile) as f:
+            tree = ElementTree.parse(f)
+        record["bytes"] += zf.getinfo(instancefile).file_size
+
+    root = tree.getroot()
+
+    instanceName: Optional[str] = _get_name(root)
+
+    node_list = _get_node_list(root)
+
+    n: int = len(node_list)
+
+    # edges, distance, time
+    with stats.stage("distance"):
+        m, c, t, x, y = _get_distance(n, node_list)
+
+    # vehicle profile
+    fleet = root.find("fleet")
+    Q, T = _get_vehicle_profile(fleet)
+
+    # requests
+    with stats.stage("requests"):
+        requests = root.find("requests")
+        d, a, b = _get_requests(requests, n, m, t)
+
+    # set tw for duplicate depot node
+    a[n - 1] = a[0]
+    b[n - 1] = T
+
+    return (instanceName, n, m, c, d, Q, t, a, b, x, y)
+
+
 def _get_name(root: ElementTree.Element) -> Optional[str]:
     info = root.find("info")
     if info:
@@ -148,9 +278,6 @@ def _get_node_list(root: ElementTree.Element):
 def _get_distance(n, nodes: List[ElementTree.Element]):
     x: List[int] = [0] * n
     y: List[int] = [0] * n
-    m: List[Tuple[int, int]] = []
-    c: List[float] = []
-    t: List[float] = []
 
     # calculate distance
     for node in nodes:
@@ -172,25 +299,7 @@ def _get_distance(n, nodes: List[ElementTree.Element]):
         else:
             raise KeyError("no 'cy' element")
 
-    for i in range(n):
-        for j in range(n):
-            if j <= i:
-                continue
-
-            value = (
-                int(math.sqrt(math.pow(x[i] - x[j], 2) + math.pow(y[i] - y[j], 2)) * 10)
-                / 10
-            )
-
-            if i != n - 1 and j != 0 and not (i == 0 and j == n - 1):
-                c.append(value)
-                t.append(value)
-                m.append((i, j))
-
-            if j != n - 1 and i != 0:
-                c.append(value)
-                t.append(value)
-                m.append((j, i))
+    m, c, t = get_arcs(n, x, y)
 
     return m, c, t, x, y
 
@@ -288,3 +397,47 @@ def _get_service_time(service_time, t, i, m):
     for j, e in enumerate(m):
         if e[0] == i:
             t[j] += s
+
+
+def get_derived(instance: Tuple) -> Tuple[array.array, bytearray, bytearray]:
+    """
+    Computes the neighbourhood and compatibility structures routing heuristics
+    start from.
+
+    Usage for an instance is:
+    ```python
+    neighbours, tw, load = get_derived(bunch["instance"])
+    ```
+
+    Parameters:
+        instance: Tuple `(name, n, E, c, d, Q, t, a, b, x, y)` of a VRPTW instance.
+
+    Returns:
+        Three row-major `n` by `n` structures. `neighbours` is an
+        `array.array("i")` whose row `i` holds the heads of the edges leaving `i`
+        sorted by cost, padded with `-1`. `tw` and `load` are bit-packed masks with
+        rows of `(n + 7) // 8` bytes. Bit `j % 8` of byte `i * ((n + 7) // 8) + j // 8`
+        is set if edge `(i, j)` exists and `j` can be reached within its time
+        window, `a[i] + t[i, j] <= b[j]`, respectively if `d[i] + d[j] <= Q`.
+    """
+    name, n, m, c, d, Q, t, a, b, x, y = instance
+
+    stride = (n + 7) // 8
+    tw = bytearray(n * stride)
+    load = bytearray(n * stride)
+    rows: List[List[int]] = [[] for _ in range(n)]
+
+    for k, (i, j) in enumerate(m):
+        rows[i].append(k)
+        bit = 1 << (j % 8)
+        if a[i] + t[k] <= b[j]:
+            tw[i * stride + j // 8] |= bit
+        if d[i] + d[j] <= Q:
+            load[i * stride + j // 8] |= bit
+
+    neighbours = array.array("i", [-1]) * (n * n)
+    for i, row in enumerate(rows):
+        row.sort(key=c.__getitem__)
+        neighbours[i * n : i * n + len(row)] = array.array("i", [m[k][1] for k in row])
+
+    return neighbours, tw, load
@@ -16,10 +16,9 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     packages=["or_datasets"],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     classifiers=[
         "License :: OSI Approved :: MIT License",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",